@@ -7,12 +7,13 @@
 
 import streamlit as st
 import base64
+import hashlib
 import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 import openai
-from PIL import Image
+from PIL import Image, ImageOps
 import io
 
 
@@ -20,6 +21,58 @@ import io
 load_dotenv()
 
 
+# 전송 전 이미지 축소 설정 (긴 변 기준 픽셀, JPEG 품질)
+MAX_IMAGE_DIMENSION = 1024
+JPEG_QUALITY = 85
+
+# 이 크기 이하의 작은 JPEG는 다시 인코딩하지 않고 그대로 전송
+PASSTHROUGH_MAX_JPEG_BYTES = 500_000
+JPEG_SIGNATURE = b'\xff\xd8\xff'
+
+# Vision API 응답 지연 설정
+# - 응답 JSON은 보통 250토큰 안쪽이므로 출력 한도를 그에 맞게 제한
+# - 서비스 등급은 .env의 OPENAI_SERVICE_TIER로 변경 가능 (기본: priority)
+ANALYSIS_MAX_TOKENS = 350
+OPENAI_SERVICE_TIER = os.getenv('OPENAI_SERVICE_TIER', 'priority')
+
+
+# 분석 프롬프트 (매 호출마다 다시 만들지 않도록 모듈 상수로 정의)
+ANALYSIS_SYSTEM_PROMPT = """당신은 한국의 농작물 전문가입니다.
+이미지를 보고 다음 정보를 JSON 형식으로 제공하세요:
+
+{
+  "name": "농작물 한글 이름",
+  "name_en": "영어 이름",
+  "confidence": 0.95,
+  "category": "과일/채소/곡물 등",
+  "famous_regions": ["한국 내 유명 생산지1", "한국 내 유명 생산지2", "한국 내 유명 생산지3"],
+  "season": "제철 시기 (예: 5월~8월)",
+  "nutrition": "주요 영양소 간단 설명",
+  "storage": "보관 방법 간단 설명",
+  "taste": "맛 특징 간단 설명"
+}
+
+중요 규칙:
+- famous_regions는 반드시 대한민국 내의 지역만 포함하세요 (예: 제주도, 나주, 충주, 영천, 김천 등)
+- 한국에서 잘 재배되지 않는 작물이라도 한국에서 재배하는 지역을 찾아서 답변하세요
+- 반드시 JSON 형식으로만 답변하세요
+- 마크다운 코드 블록(```)은 사용하지 마세요"""
+
+ANALYSIS_USER_PROMPT = """이 이미지의 농작물을 분석하고 상세 정보를 JSON으로 제공해주세요."""
+
+ANALYSIS_BASE_MESSAGES = [
+    {
+        "role": "system",
+        "content": ANALYSIS_SYSTEM_PROMPT
+    }
+]
+
+ANALYSIS_USER_TEXT_PART = {
+    "type": "text",
+    "text": ANALYSIS_USER_PROMPT
+}
+
+
 # 페이지 설정
 st.set_page_config(
     page_title="농작물 AI 식별기",
@@ -28,117 +81,174 @@ st.set_page_config(
 )
 
 
-def load_image_as_base64(image_bytes: bytes) -> str:
+def decode_uploaded_image(image_file: io.BytesIO) -> Image.Image:
     """
-    이미지 바이트를 base64로 변환합니다.
+    업로드된 이미지 파일을 한 번만 디코딩합니다.
+    
+    JPEG는 draft 모드로 디코딩 단계에서 바로 축소해서 읽으므로
+    큰 휴대폰 사진도 원본 해상도 전체를 풀지 않습니다.
+    디코딩된 이미지는 화면 표시와 base64 변환에 함께 사용합니다.
     
     Args:
-        image_bytes: 이미지 바이너리 데이터
+        image_file: 업로드된 이미지 파일 객체 (바이트로 복사하지 않고 바로 읽음)
         
     Returns:
-        base64 인코딩된 이미지 문자열
+        회전 정보(EXIF)가 반영된 PIL 이미지
     """
-    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-    return f"data:image/jpeg;base64,{encoded_image}"
+    image = Image.open(image_file)
+    image.draft('RGB', (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
+    
+    return ImageOps.exif_transpose(image)
 
 
-def analyze_crop_with_ai(image_base64: str, api_key: str) -> dict:
+def is_small_jpeg(image_file: io.BytesIO) -> bool:
     """
-    Vision API로 농작물을 분석하고 상세 정보를 받습니다.
+    업로드된 파일이 이미 충분히 작은 JPEG인지 확인합니다.
+    
+    JPEG 시그니처와 파일 크기를 먼저 확인하고, 이미지 크기는 헤더만 읽어서
+    확인하므로 전체 디코딩이 일어나지 않습니다.
     
     Args:
-        image_base64: base64 인코딩된 이미지
-        api_key: OpenAI API 키
+        image_file: 업로드된 이미지 파일 객체
         
     Returns:
-        분석 결과 딕셔너리
+        다시 인코딩할 필요 없는 작은 JPEG이면 True
     """
-    client = openai.OpenAI(api_key=api_key)
+    image_buffer = image_file.getbuffer()
     
-    system_prompt = """당신은 한국의 농작물 전문가입니다.
-이미지를 보고 다음 정보를 JSON 형식으로 제공하세요:
-
-{
-  "name": "농작물 한글 이름",
-  "name_en": "영어 이름",
-  "confidence": 0.95,
-  "category": "과일/채소/곡물 등",
-  "famous_regions": ["한국 내 유명 생산지1", "한국 내 유명 생산지2", "한국 내 유명 생산지3"],
-  "season": "제철 시기 (예: 5월~8월)",
-  "nutrition": "주요 영양소 간단 설명",
-  "storage": "보관 방법 간단 설명",
-  "taste": "맛 특징 간단 설명"
-}
+    if image_buffer[:3] != JPEG_SIGNATURE or len(image_buffer) > PASSTHROUGH_MAX_JPEG_BYTES:
+        return False
+    
+    with Image.open(image_file) as header_image:
+        return max(header_image.size) <= MAX_IMAGE_DIMENSION
 
-중요 규칙:
-- famous_regions는 반드시 대한민국 내의 지역만 포함하세요 (예: 제주도, 나주, 충주, 영천, 김천 등)
-- 한국에서 잘 재배되지 않는 작물이라도 한국에서 재배하는 지역을 찾아서 답변하세요
-- 반드시 JSON 형식으로만 답변하세요
-- 마크다운 코드 블록(```)은 사용하지 마세요"""
 
-    user_prompt = """이 이미지의 농작물을 분석하고 상세 정보를 JSON으로 제공해주세요."""
+def load_image_as_base64(image_file: io.BytesIO, image: Image.Image) -> str:
+    """
+    업로드된 이미지를 base64로 변환합니다.
     
-    try:
-        response = client.chat.completions.create(
-            model='gpt-4o-mini',
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": user_prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": image_base64
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=500
-        )
+    이미 작은 JPEG는 원본 바이트를 그대로 사용하고(재인코딩 시 오히려 용량이
+    커지거나 화질이 떨어질 수 있음), 그 외에는 긴 변이 MAX_IMAGE_DIMENSION을
+    넘지 않도록 축소한 뒤 JPEG로 다시 인코딩합니다.
+    
+    Args:
+        image_file: 업로드된 이미지 파일 객체
+        image: 디코딩된 PIL 이미지
         
-        response_text = response.choices[0].message.content.strip()
+    Returns:
+        base64 인코딩된 이미지 문자열
+    """
+    if is_small_jpeg(image_file):
+        encoded_image = base64.b64encode(image_file.getbuffer()).decode('ascii')
+        return f"data:image/jpeg;base64,{encoded_image}"
+    
+    # 표시용 원본은 그대로 두고 복사본을 축소
+    resized_image = image.copy()
+    resized_image.thumbnail(
+        (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION),
+        Image.Resampling.LANCZOS
+    )
+    
+    jpeg_buffer = io.BytesIO()
+    resized_image.convert('RGB').save(
+        jpeg_buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True
+    )
+    
+    encoded_image = base64.b64encode(jpeg_buffer.getbuffer()).decode('ascii')
+    return f"data:image/jpeg;base64,{encoded_image}"
+
+
+@st.cache_resource
+def get_openai_client() -> openai.OpenAI:
+    """
+    세션 전체에서 공유하는 OpenAI 클라이언트를 반환합니다.
+    
+    매 요청마다 클라이언트를 새로 만들지 않고 연결 풀을 재사용합니다.
+    
+    Returns:
+        openai.OpenAI 클라이언트
+    """
+    return openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def analyze_crop_with_ai(
+    image_digest: str,
+    _image_file: io.BytesIO,
+    _image: Image.Image
+) -> dict:
+    """
+    Vision API로 농작물을 분석하고 상세 정보를 받습니다.
+    
+    Streamlit은 위젯을 조작할 때마다 스크립트를 다시 실행하므로,
+    결과를 이미지 내용 해시 기준으로 캐시하여 같은 이미지는 다시 분석하지 않습니다.
+    (밑줄로 시작하는 인자는 Streamlit이 해시하지 않습니다.)
+    API 호출 오류와 JSON 파싱 실패는 캐시되지 않도록 예외로 그대로 전달합니다.
+    
+    Args:
+        image_digest: 이미지 내용의 해시 (캐시 키)
+        _image_file: 업로드된 이미지 파일 객체
+        _image: 디코딩된 PIL 이미지
         
-        # 마크다운 코드 블록 제거 (```json ... ``` 형태)
-        if response_text.startswith("```"):
-            # 첫 번째 줄 제거 (```json)
-            lines = response_text.split('\n')
-            if lines[0].startswith("```"):
-                lines = lines[1:]
-            # 마지막 줄 제거 (```)
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]
-            response_text = '\n'.join(lines).strip()
+    Returns:
+        분석 결과 딕셔너리
         
-        # JSON 파싱
+    Raises:
+        json.JSONDecodeError: 응답에서 JSON을 추출할 수 없는 경우
+            (doc 속성에 원본 응답 텍스트가 들어 있음)
+    """
+    client = get_openai_client()
+    image_base64 = load_image_as_base64(_image_file, _image)
+    
+    # 고정된 시스템 메시지/텍스트 파트는 재사용하고 이미지 파트만 새로 만듦
+    messages = ANALYSIS_BASE_MESSAGES + [
+        {
+            "role": "user",
+            "content": [
+                ANALYSIS_USER_TEXT_PART,
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": image_base64,
+                        # 저해상도 단일 타일로 처리하여 이미지 전처리 시간 단축
+                        "detail": "low"
+                    }
+                }
+            ]
+        }
+    ]
+    
+    response = client.chat.completions.create(
+        model='gpt-4o-mini',
+        messages=messages,
+        # JSON 모드: 코드 블록 없이 JSON 객체만 반환하도록 보장
+        response_format={"type": "json_object"},
+        max_tokens=ANALYSIS_MAX_TOKENS,
+        temperature=0,
+        service_tier=OPENAI_SERVICE_TIER
+    )
+    
+    response_text = response.choices[0].message.content.strip()
+    
+    # JSON 파싱
+    try:
+        result = json.loads(response_text)
+        return result
+    except json.JSONDecodeError:
+        # JSON 모드에서는 드문 경우 (예: 토큰 한도로 잘린 응답) - JSON 부분만 추출 시도
         try:
-            result = json.loads(response_text)
-            return result
-        except json.JSONDecodeError as e:
-            # JSON을 찾아서 추출 시도
-            try:
-                # { 부터 } 까지 추출
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}')
-                if start_idx != -1 and end_idx != -1:
-                    json_text = response_text[start_idx:end_idx+1]
-                    result = json.loads(json_text)
-                    return result
-            except:
-                pass
-            
-            return {"error": "JSON 파싱 실패", "raw_response": response_text, "parse_error": str(e)}
-            
-    except Exception as e:
-        return {"error": str(e)}
+            # { 부터 } 까지 추출
+            start_idx = response_text.find('{')
+            end_idx = response_text.rfind('}')
+            if start_idx != -1 and end_idx != -1:
+                json_text = response_text[start_idx:end_idx+1]
+                result = json.loads(json_text)
+                return result
+        except:
+            pass
+        
+        # 오류 결과가 캐시되지 않도록 예외로 전달 (오류 표시는 main에서 처리)
+        raise
 
 
 def display_result(result: dict, image):
@@ -267,13 +377,14 @@ def main():
         )
         
         if uploaded_file:
-            uploaded_image = uploaded_file.read()
+            # 파일 객체를 그대로 사용 (.read()로 바이트 사본을 만들지 않음)
+            uploaded_image = uploaded_file
     
     else:  # 카메라 촬영
         camera_photo = st.camera_input("농작물 사진 촬영")
         
         if camera_photo:
-            uploaded_image = camera_photo.read()
+            uploaded_image = camera_photo
     
     # 이미지가 업로드되면 분석 시작
     if uploaded_image:
@@ -281,14 +392,21 @@ def main():
         st.markdown("## 🔍 분석 중...")
         
         with st.spinner("AI가 농작물을 분석하고 있습니다..."):
-            # 이미지를 base64로 변환
-            image_base64 = load_image_as_base64(uploaded_image)
+            # 이미지를 한 번만 디코딩 (표시와 base64 변환에 함께 사용)
+            pil_image = decode_uploaded_image(uploaded_image)
             
-            # AI 분석
-            result = analyze_crop_with_ai(image_base64, api_key)
+            # 이미지 내용 해시 (getbuffer는 복사 없이 업로드 데이터를 참조)
+            image_digest = hashlib.blake2b(
+                uploaded_image.getbuffer(), digest_size=16
+            ).hexdigest()
             
-            # PIL Image로 변환 (표시용)
-            pil_image = Image.open(io.BytesIO(uploaded_image))
+            # AI 분석 (같은 이미지는 캐시된 결과 사용)
+            try:
+                result = analyze_crop_with_ai(image_digest, uploaded_image, pil_image)
+            except json.JSONDecodeError as e:
+                result = {"error": "JSON 파싱 실패", "raw_response": e.doc, "parse_error": str(e)}
+            except Exception as e:
+                result = {"error": str(e)}
         
         # 결과 표시
         st.success("✅ 분석 완료!")
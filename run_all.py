@@ -8,21 +8,24 @@
 4. 정확도 평가
 """
 
-import sys
-import subprocess
+import traceback
 from pathlib import Path
+from typing import Callable
+
+# 각 단계를 별도 파이썬 프로세스로 띄우지 않고 같은 프로세스에서 실행
+from src import classify_images, create_answer_template, evaluate_accuracy
 
 
 PROJECT_ROOT = Path(__file__).parent
 ANSWER_FILE_PATH = PROJECT_ROOT / 'data' / 'answer.csv'
 
 
-def run_script(script_path: str, description: str) -> bool:
+def run_step(step_main: Callable[[], None], description: str) -> bool:
     """
-    파이썬 스크립트를 실행합니다.
+    단계별 스크립트의 main 함수를 현재 프로세스에서 실행합니다.
     
     Args:
-        script_path: 실행할 스크립트 경로
+        step_main: 실행할 스크립트의 main 함수
         description: 스크립트 설명
         
     Returns:
@@ -35,16 +38,18 @@ def run_script(script_path: str, description: str) -> bool:
     print()
     
     try:
-        result = subprocess.run(
-            [sys.executable, script_path],
-            check=True,
-            capture_output=False
-        )
+        step_main()
         return True
-    except subprocess.CalledProcessError:
-        print()
-        print(f"❌ {description} 실행 중 오류가 발생했습니다.")
-        return False
+    except SystemExit as exit_error:
+        # sys.exit(0) 또는 sys.exit()는 정상 종료로 간주
+        if exit_error.code in (None, 0):
+            return True
+    except Exception:
+        traceback.print_exc()
+    
+    print()
+    print(f"❌ {description} 실행 중 오류가 발생했습니다.")
+    return False
 
 
 def check_answer_file_filled() -> bool:
@@ -89,7 +94,7 @@ def main():
     if not ANSWER_FILE_PATH.exists():
         print()
         print("📋 1단계: 정답 템플릿 생성")
-        if not run_script('src/create_answer_template.py', '정답 템플릿 생성'):
+        if not run_step(create_answer_template.main, '정답 템플릿 생성'):
             return
         
         print()
@@ -122,13 +127,14 @@ def main():
     # 2단계: 이미지 분류
     print()
     print("🔍 2단계: 이미지 분류 실행")
-    if not run_script('src/classify_images.py', 'AI 이미지 분류'):
+    # 인자를 빈 리스트로 넘겨 run_all.py 자신의 명령행 인자를 읽지 않도록 함
+    if not run_step(lambda: classify_images.main([]), 'AI 이미지 분류'):
         return
     
     # 3단계: 정확도 평가
     print()
     print("📊 3단계: 정확도 평가")
-    if not run_script('src/evaluate_accuracy.py', '정확도 평가'):
+    if not run_step(evaluate_accuracy.main, '정확도 평가'):
         return
     
     # 완료
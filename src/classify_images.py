@@ -3,13 +3,22 @@
 
 img/ 폴더의 모든 이미지를 OpenAI Vision API로 분류하고,
 결과를 data/predictions.csv에 저장합니다.
+
+사용법:
+    python src/classify_images.py           # 동기 호출 (빠른 결과, 소량 이미지)
+    python src/classify_images.py --batch   # Batch API (요금 50%, 대량 이미지)
 """
 
+import argparse
+import asyncio
 import csv
+import logging
 import os
 import sys
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
 # 부모 디렉토리를 경로에 추가하여 src 모듈 import 가능하도록
@@ -17,10 +26,15 @@ sys.path.append(str(Path(__file__).parent))
 
 from utils import (
     load_image_as_base64,
-    call_vision_api,
+    call_vision_api_batch,
+    run_vision_batch,
+    compute_file_digest,
     load_answers_from_csv,
-    validate_image_file
+    validate_dir_entry,
+    API_MAX_CONCURRENCY,
+    logger as utils_logger
 )
+from local_classifier import classify_locally
 
 
 # 경로 상수
@@ -29,6 +43,9 @@ IMAGE_FOLDER_PATH = PROJECT_ROOT / 'img'
 ANSWER_FILE_PATH = PROJECT_ROOT / 'data' / 'answer.csv'
 PREDICTIONS_FILE_PATH = PROJECT_ROOT / 'data' / 'predictions.csv'
 
+# API 차례를 기다리며 미리 인코딩해 둘 최대 이미지 수 (메모리 사용량 상한)
+ENCODE_AHEAD_LIMIT = API_MAX_CONCURRENCY * 2
+
 
 def get_image_files(folder_path: Path) -> List[Path]:
     """
@@ -44,66 +61,345 @@ def get_image_files(folder_path: Path) -> List[Path]:
         print(f"❌ 이미지 폴더가 존재하지 않습니다: {folder_path}")
         return []
     
-    image_files = [
-        file_path for file_path in folder_path.iterdir()
-        if validate_image_file(file_path)
-    ]
+    # os.scandir는 디렉토리를 읽을 때 파일 종류를 함께 받아오므로 파일마다 stat 호출이 필요 없음
+    with os.scandir(folder_path) as entries:
+        image_files = [
+            Path(entry.path) for entry in entries if validate_dir_entry(entry)
+        ]
     
     # 파일명 기준으로 정렬
     return sorted(image_files, key=lambda x: x.name)
 
 
-def classify_single_image(
+def build_prediction(
     image_path: Path,
-    api_key: str,
-    true_label: str
+    true_label: str,
+    prediction_result: Optional[Dict[str, any]]
 ) -> Dict[str, any]:
     """
-    단일 이미지를 분류하고 결과를 반환합니다.
+    API 응답을 예측 결과 딕셔너리로 변환합니다.
     
     Args:
-        image_path: 분류할 이미지 파일 경로
-        api_key: OpenAI API 키
+        image_path: 분류한 이미지 파일 경로
         true_label: 정답 라벨
+        prediction_result: call_vision_api_async의 반환값 (실패 시 None)
         
     Returns:
         분류 결과 딕셔너리
     """
-    try:
-        # 이미지를 base64로 변환
-        image_base64 = load_image_as_base64(str(image_path))
-        
-        # Vision API 호출
-        prediction_result = call_vision_api(image_base64, api_key)
-        
-        # API 호출 실패 처리
-        if prediction_result is None:
-            return {
-                'filename': image_path.name,
-                'true_label': true_label,
-                'pred_label': 'ERROR',
-                'pred_confidence': 0.0
-            }
-        
-        # 결과 추출
-        predicted_crop = prediction_result.get('crop', 'unknown')
-        predicted_confidence = prediction_result.get('confidence', 0.0)
-        
-        return {
-            'filename': image_path.name,
-            'true_label': true_label,
-            'pred_label': predicted_crop,
-            'pred_confidence': predicted_confidence
-        }
-        
-    except Exception as error:
-        print(f"❌ {image_path.name} 처리 중 오류: {str(error)}")
+    # API 호출 실패 처리
+    if prediction_result is None:
         return {
             'filename': image_path.name,
             'true_label': true_label,
             'pred_label': 'ERROR',
             'pred_confidence': 0.0
         }
+    
+    return {
+        'filename': image_path.name,
+        'true_label': true_label,
+        'pred_label': prediction_result.get('crop', 'unknown'),
+        'pred_confidence': prediction_result.get('confidence', 0.0)
+    }
+
+
+def prepare_image(
+    image_path: Path
+) -> Tuple[Optional[Dict[str, any]], Optional[str]]:
+    """
+    API 호출 전 준비 단계: 로컬 모델로 먼저 분류하고, 필요할 때만 인코딩합니다.
+    
+    로컬 모델(local_classifier)이 높은 확신도로 분류하면 그 결과를 바로 사용하고,
+    그렇지 않으면 Vision API로 보낼 base64 문자열을 만듭니다.
+    
+    Args:
+        image_path: 이미지 파일 경로
+        
+    Returns:
+        (로컬 분류 결과, base64 인코딩된 이미지) 튜플 - 둘 중 하나만 값이 있음
+    """
+    local_result = classify_locally(image_path)
+    
+    if local_result is not None:
+        return local_result, None
+    
+    return None, load_image_as_base64(str(image_path))
+
+
+def group_duplicate_images(
+    labeled_images: List[Tuple[Path, str]]
+) -> List[List[Tuple[Path, str]]]:
+    """
+    내용이 같은 이미지끼리 묶습니다.
+    
+    샘플 이미지를 복사해 두는 경우처럼 같은 사진이 여러 번 들어 있으면
+    한 번만 분류하고 결과를 나눠 쓰기 위해 사용합니다.
+    
+    Args:
+        labeled_images: (이미지 경로, 정답 라벨) 튜플의 리스트
+        
+    Returns:
+        같은 내용의 (이미지 경로, 정답 라벨) 튜플 리스트들의 리스트
+    """
+    groups = defaultdict(list)
+    
+    for image_path, true_label in labeled_images:
+        try:
+            group_key = compute_file_digest(image_path)
+        except OSError:
+            # 읽을 수 없는 파일은 단독 그룹으로 두고 분류 단계에서 오류 처리
+            group_key = f"unreadable:{image_path}"
+        
+        groups[group_key].append((image_path, true_label))
+    
+    return list(groups.values())
+
+
+def expand_duplicate_predictions(
+    image_groups: List[List[Tuple[Path, str]]],
+    predictions: List[Dict]
+) -> List[Dict]:
+    """
+    그룹의 대표 이미지 분류 결과를 같은 내용의 나머지 이미지에도 적용합니다.
+    
+    Args:
+        image_groups: group_duplicate_images의 반환값
+        predictions: 각 그룹의 대표(첫 번째) 이미지 분류 결과 리스트
+        
+    Returns:
+        모든 이미지의 분류 결과 리스트
+    """
+    prediction_by_filename = {
+        prediction['filename']: prediction for prediction in predictions
+    }
+    all_predictions = list(predictions)
+    
+    for group in image_groups:
+        source_prediction = prediction_by_filename[group[0][0].name]
+        
+        for image_path, true_label in group[1:]:
+            all_predictions.append({
+                **source_prediction,
+                'filename': image_path.name,
+                'true_label': true_label
+            })
+    
+    return all_predictions
+
+
+async def classify_images_concurrently(
+    labeled_images: List[Tuple[Path, str]],
+    api_key: str,
+    on_complete: Callable[[Path, str, Optional[Dict[str, any]]], None]
+) -> None:
+    """
+    이미지 준비(로컬 분류/인코딩)와 Vision API 호출을 겹쳐서 실행합니다.
+    
+    프로세스 풀에서 준비한 이미지를 비동기 생성기로 call_vision_api_batch에 넘겨,
+    다른 이미지를 인코딩하는 동안 이미 보낸 요청의 응답을 기다리게 합니다.
+    미리 인코딩하는 이미지는 ENCODE_AHEAD_LIMIT개로 제한하므로
+    이미지가 많아도 API 차례를 기다리는 base64 문자열이 메모리에 쌓이지 않습니다.
+    
+    Args:
+        labeled_images: (이미지 경로, 정답 라벨) 튜플의 리스트
+        api_key: OpenAI API 키
+        on_complete: 이미지 하나가 끝날 때마다 (경로, 정답 라벨, 분류 결과)로 호출되는 함수
+    """
+    loop = asyncio.get_running_loop()
+    
+    # API로 보낸 이미지 (call_vision_api_batch의 인덱스 순서)
+    api_images = []
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as encode_pool:
+        async def produce_payloads():
+            image_iterator = iter(labeled_images)
+            encode_futures = {}
+            
+            def submit_next_image() -> None:
+                for image_path, true_label in image_iterator:
+                    encode_future = loop.run_in_executor(encode_pool, prepare_image, image_path)
+                    encode_futures[encode_future] = (image_path, true_label)
+                    return
+            
+            for _ in range(ENCODE_AHEAD_LIMIT):
+                submit_next_image()
+            
+            while encode_futures:
+                done_futures, _ = await asyncio.wait(
+                    encode_futures, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                for encode_future in done_futures:
+                    image_path, true_label = encode_futures.pop(encode_future)
+                    
+                    # 하나가 끝나면 다음 이미지 인코딩 시작
+                    submit_next_image()
+                    
+                    try:
+                        local_result, image_base64 = encode_future.result()
+                    except Exception as error:
+                        print(f"❌ {image_path.name} 처리 중 오류: {str(error)}")
+                        on_complete(image_path, true_label, None)
+                        continue
+                    
+                    # 로컬 모델이 확신하는 이미지는 API를 호출하지 않음
+                    if local_result is not None:
+                        on_complete(image_path, true_label, local_result)
+                        continue
+                    
+                    api_images.append((image_path, true_label))
+                    yield image_base64
+        
+        def on_api_complete(index: int, prediction_result: Optional[Dict[str, any]]) -> None:
+            image_path, true_label = api_images[index]
+            on_complete(image_path, true_label, prediction_result)
+        
+        await call_vision_api_batch(
+            produce_payloads(), api_key, on_complete=on_api_complete
+        )
+
+
+def classify_labeled_images(
+    labeled_images: List[Tuple[Path, str]],
+    api_key: str
+) -> List[Dict]:
+    """
+    여러 이미지를 분류합니다.
+    
+    로컬 모델 분류와 이미지 축소/인코딩은 프로세스 풀에서(CPU 작업, GIL 영향 없음),
+    Vision API 호출은 비동기로(네트워크 대기) 처리하며 두 작업이 동시에 진행됩니다.
+    
+    Args:
+        labeled_images: (이미지 경로, 정답 라벨) 튜플의 리스트
+        api_key: OpenAI API 키
+        
+    Returns:
+        분류 결과 딕셔너리의 리스트 (완료된 순서)
+    """
+    all_predictions = []
+    total_count = len(labeled_images)
+    
+    # 완료되는 순서대로 결과를 모으고 진행 상황 표시
+    def record_prediction(
+        image_path: Path,
+        true_label: str,
+        prediction_result: Optional[Dict[str, any]]
+    ) -> None:
+        prediction = build_prediction(image_path, true_label, prediction_result)
+        all_predictions.append(prediction)
+        display_progress(
+            len(all_predictions),
+            total_count,
+            prediction['filename'],
+            prediction['pred_label'],
+            prediction['pred_confidence'],
+            true_label
+        )
+    
+    asyncio.run(
+        classify_images_concurrently(labeled_images, api_key, on_complete=record_prediction)
+    )
+    
+    return all_predictions
+
+
+def classify_labeled_images_in_batch(
+    labeled_images: List[Tuple[Path, str]],
+    api_key: str
+) -> List[Dict]:
+    """
+    여러 이미지를 OpenAI Batch API로 한 번에 분류합니다.
+    
+    인코딩한 이미지를 바로 배치 요청 파일에 써서 제출하고 완료될 때까지 기다립니다.
+    (입력 파일 한도를 넘으면 run_vision_batch가 여러 배치로 나눠 제출)
+    대량의 이미지를 저렴하게, 속도 제한 걱정 없이 분류할 때 사용합니다.
+    
+    Args:
+        labeled_images: (이미지 경로, 정답 라벨) 튜플의 리스트
+        api_key: OpenAI API 키
+        
+    Returns:
+        분류 결과 딕셔너리의 리스트
+    """
+    all_predictions = []
+    
+    # 배치에 넣은 이미지 (요청ID = 파일명)
+    pending_images = []
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as encode_pool:
+        # 1. 이미지 인코딩 (프로세스 풀에서 병렬 처리)
+        # run_vision_batch가 요청 줄을 쓸 때마다 하나씩 꺼내 가므로 미리 인코딩하는
+        # 이미지는 ENCODE_AHEAD_LIMIT개로 제한되고, base64 문자열이 메모리에 쌓이지 않음
+        def produce_payloads():
+            image_iterator = iter(labeled_images)
+            encode_futures = {}
+            
+            def submit_next_image() -> None:
+                for image_path, true_label in image_iterator:
+                    encode_future = encode_pool.submit(prepare_image, image_path)
+                    encode_futures[encode_future] = (image_path, true_label)
+                    return
+            
+            for _ in range(ENCODE_AHEAD_LIMIT):
+                submit_next_image()
+            
+            while encode_futures:
+                done_futures, _ = wait(encode_futures, return_when=FIRST_COMPLETED)
+                
+                for encode_future in done_futures:
+                    image_path, true_label = encode_futures.pop(encode_future)
+                    
+                    # 하나가 끝나면 다음 이미지 인코딩 시작
+                    submit_next_image()
+                    
+                    try:
+                        local_result, image_base64 = encode_future.result()
+                    except Exception as error:
+                        print(f"❌ {image_path.name} 처리 중 오류: {str(error)}")
+                        all_predictions.append(build_prediction(image_path, true_label, None))
+                        continue
+                    
+                    # 로컬 모델이 확신하는 이미지는 배치에 넣지 않음
+                    if local_result is not None:
+                        all_predictions.append(
+                            build_prediction(image_path, true_label, local_result)
+                        )
+                        continue
+                    
+                    pending_images.append((image_path, true_label))
+                    yield image_path.name, image_base64
+        
+        # 2. 배치 작업 제출 및 완료 대기
+        payload_iterator = produce_payloads()
+        
+        try:
+            batch_results = run_vision_batch(payload_iterator, api_key)
+        except Exception as error:
+            print(f"❌ 배치 작업 중 오류 발생: {str(error)}")
+            batch_results = {}
+            
+            # 제출 중에 실패해도 남은 이미지의 로컬 분류 결과는 살림 (API 이미지는 ERROR 처리)
+            for _ in payload_iterator:
+                pass
+    
+    # 3. 결과 정리
+    for image_path, true_label in pending_images:
+        all_predictions.append(
+            build_prediction(image_path, true_label, batch_results.get(image_path.name))
+        )
+    
+    for index, prediction in enumerate(all_predictions, start=1):
+        display_progress(
+            index,
+            len(all_predictions),
+            prediction['filename'],
+            prediction['pred_label'],
+            prediction['pred_confidence'],
+            prediction['true_label']
+        )
+    
+    return all_predictions
 
 
 def save_predictions_to_csv(
@@ -123,12 +419,19 @@ def save_predictions_to_csv(
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     # utf-8-sig: Excel에서 한글이 깨지지 않도록 BOM 포함
+    fieldnames = ['filename', 'true_label', 'pred_label', 'pred_confidence']
+    
+    # 필드 순서대로 미리 튜플을 만들어 두면 행마다 딕셔너리 변환을 하지 않아도 됨
+    rows = [
+        (p['filename'], p['true_label'], p['pred_label'], p['pred_confidence'])
+        for p in predictions
+    ]
+    
     with open(output_path, 'w', newline='', encoding='utf-8-sig') as csv_file:
-        fieldnames = ['filename', 'true_label', 'pred_label', 'pred_confidence']
-        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        writer = csv.writer(csv_file)
         
-        writer.writeheader()
-        writer.writerows(predictions)
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
 
 
 def display_progress(
@@ -151,7 +454,7 @@ def display_progress(
         true_label: 정답 라벨
     """
     # 정답 여부 확인
-    is_correct = predicted_label.lower() == true_label.lower()
+    is_correct = predicted_label.casefold() == true_label.casefold()
     result_icon = "✅" if is_correct else "❌"
     
     # 확신도를 퍼센트로 변환
@@ -164,9 +467,55 @@ def display_progress(
     )
 
 
-def main():
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    명령행 인자를 파싱합니다.
+    
+    Args:
+        argv: 명령행 인자 리스트 (None이면 sys.argv 사용)
+        
+    Returns:
+        파싱된 인자
     """
-    메인 실행 함수: 모든 이미지를 분류하고 결과를 저장합니다.
+    parser = argparse.ArgumentParser(description="img/ 폴더의 농작물 이미지를 분류합니다.")
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help="OpenAI Batch API로 분류 (요금 50%%, 완료까지 수 분~수 시간 소요, 대량 이미지용)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    메인 실행 함수: 로그 출력을 설정하고 분류를 실행합니다.
+    
+    Args:
+        argv: 명령행 인자 리스트 (None이면 sys.argv 사용)
+    """
+    args = parse_arguments(argv)
+    
+    # utils의 오류/경고 로그를 다른 진행 메시지(print)와 같은 stdout에 같은 순서로 출력
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+    previous_level = utils_logger.level
+    utils_logger.addHandler(console_handler)
+    utils_logger.setLevel(logging.INFO)
+    
+    try:
+        run_classification(args)
+    finally:
+        # 다른 코드에서 import해 실행한 경우를 위해 로거 설정을 원래대로 되돌림
+        utils_logger.removeHandler(console_handler)
+        utils_logger.setLevel(previous_level)
+
+
+def run_classification(args: argparse.Namespace):
+    """
+    모든 이미지를 분류하고 결과를 저장합니다.
+    
+    Args:
+        args: 파싱된 명령행 인자
     """
     print("=" * 70)
     print("🌾 농작물 이미지 분류 시스템")
@@ -218,9 +567,9 @@ def main():
     print("-" * 70)
     print()
     
-    # 4. 각 이미지 분류
-    all_predictions = []
+    # 4. 각 이미지 분류 (인코딩과 API 호출을 병렬 파이프라인으로 처리)
     total_images = len(image_files)
+    labeled_images = []
     
     for index, image_path in enumerate(image_files, start=1):
         filename = image_path.name
@@ -233,19 +582,25 @@ def main():
             print(f"[{index}/{total_images}] {filename} -> ⚠️  라벨 없음 (스킵)")
             continue
         
-        # 이미지 분류
-        prediction = classify_single_image(image_path, api_key, true_label)
-        all_predictions.append(prediction)
-        
-        # 진행 상황 표시
-        display_progress(
-            index,
-            total_images,
-            filename,
-            prediction['pred_label'],
-            prediction['pred_confidence'],
-            true_label
-        )
+        labeled_images.append((image_path, true_label))
+    
+    # 내용이 같은 이미지는 대표 이미지 하나만 분류
+    image_groups = group_duplicate_images(labeled_images)
+    unique_images = [group[0] for group in image_groups]
+    duplicate_count = len(labeled_images) - len(unique_images)
+    
+    if duplicate_count:
+        print(f"ℹ️  중복 이미지 {duplicate_count}개는 같은 내용의 이미지 결과를 재사용합니다.")
+    
+    if args.batch:
+        unique_predictions = classify_labeled_images_in_batch(unique_images, api_key)
+    else:
+        unique_predictions = classify_labeled_images(unique_images, api_key)
+    
+    all_predictions = expand_duplicate_predictions(image_groups, unique_predictions)
+    
+    # 완료 순서와 무관하게 파일명 순으로 저장
+    all_predictions.sort(key=lambda x: x['filename'])
     
     # 5. 결과 저장
     if all_predictions:
@@ -7,6 +7,7 @@ answer.csv 파일을 자동으로 생성합니다.
 """
 
 import csv
+import os
 from pathlib import Path
 from typing import List
 
@@ -32,10 +33,12 @@ def get_all_image_files(folder_path: Path) -> List[Path]:
         print(f"❌ 이미지 폴더가 존재하지 않습니다: {folder_path}")
         return []
     
-    image_files = [
-        file_path for file_path in folder_path.iterdir()
-        if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_IMAGE_EXTENSIONS
-    ]
+    # os.scandir는 디렉토리를 읽을 때 파일 종류를 함께 받아오므로 파일마다 stat 호출이 필요 없음
+    with os.scandir(folder_path) as entries:
+        image_files = [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(SUPPORTED_IMAGE_EXTENSIONS)
+        ]
     
     # 파일명 기준으로 정렬
     return sorted(image_files, key=lambda x: x.name)
@@ -54,18 +57,13 @@ def create_answer_template(image_files: List[Path], output_path: Path) -> None:
     
     # UTF-8 BOM으로 저장 (Excel에서도 제대로 보임)
     with open(output_path, 'w', newline='', encoding='utf-8-sig') as csv_file:
-        fieldnames = ['filename', 'label']
-        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        writer = csv.writer(csv_file)
         
         # 헤더 작성
-        writer.writeheader()
+        writer.writerow(['filename', 'label'])
         
         # 각 이미지 파일명 작성 (label은 비워둠)
-        for image_file in image_files:
-            writer.writerow({
-                'filename': image_file.name,
-                'label': ''
-            })
+        writer.writerows((image_file.name, '') for image_file in image_files)
 
 
 def display_next_steps(answer_file_path: Path, image_count: int) -> None:
@@ -6,10 +6,17 @@ predictions.csv 파일을 읽어서 정확도를 계산하고,
 """
 
 import csv
+import io
+import sys
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from collections import defaultdict
 
+# 부모 디렉토리를 경로에 추가하여 src 모듈 import 가능하도록
+sys.path.append(str(Path(__file__).parent))
+
+from utils import decode_csv_bytes
+
 
 # 경로 상수
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -20,49 +27,51 @@ def load_predictions_from_csv(csv_path: Path) -> List[Dict]:
     """
     predictions.csv 파일에서 예측 결과를 읽어옵니다.
     
-    여러 인코딩을 자동으로 시도하여 Windows 환경에서도 안전하게 작동합니다.
+    파일을 한 번만 읽고 인코딩을 판별하여 Windows 환경에서도 안전하게 작동합니다.
     
     Args:
         csv_path: predictions.csv 파일 경로
         
     Returns:
         예측 결과 딕셔너리의 리스트
+        (정답 여부를 미리 계산한 'is_correct' 키 포함)
         
     Raises:
         FileNotFoundError: CSV 파일이 존재하지 않는 경우
+        ValueError: 필수 컬럼이 없거나 유효한 예측 결과가 없는 경우
     """
     if not csv_path.exists():
         raise FileNotFoundError(f"예측 결과 파일을 찾을 수 없습니다: {csv_path}")
     
-    predictions = []
+    csv_text, _ = decode_csv_bytes(csv_path.read_bytes())
+    csv_reader = csv.DictReader(io.StringIO(csv_text, newline=''))
     
-    # Windows에서 흔히 사용되는 인코딩들을 순서대로 시도
-    encodings_to_try = ['utf-8-sig', 'utf-8', 'cp949', 'euc-kr']
+    # 필수 컬럼 확인 (누락 시 조용히 넘어가지 않고 바로 알림)
+    required_columns = {'filename', 'true_label', 'pred_label', 'pred_confidence'}
+    missing_columns = required_columns - set(csv_reader.fieldnames or [])
+    if missing_columns:
+        raise ValueError(
+            f"{csv_path}에 필요한 컬럼이 없습니다: {', '.join(sorted(missing_columns))}"
+        )
+    
+    predictions = []
     
-    for encoding in encodings_to_try:
-        try:
-            with open(csv_path, 'r', encoding=encoding, newline='') as csv_file:
-                csv_reader = csv.DictReader(csv_file)
-                
-                for row in csv_reader:
-                    # ERROR 레이블은 제외
-                    if row['pred_label'] == 'ERROR':
-                        continue
-                        
-                    predictions.append({
-                        'filename': row['filename'],
-                        'true_label': row['true_label'],
-                        'pred_label': row['pred_label'],
-                        'pred_confidence': float(row['pred_confidence'])
-                    })
-                
-                # 성공하면 루프 종료
-                break
-                
-        except (UnicodeDecodeError, UnicodeError, KeyError):
-            # 이 인코딩으로 실패하면 다음 시도
-            predictions = []
+    for row in csv_reader:
+        # ERROR 레이블은 제외
+        if row['pred_label'] == 'ERROR':
             continue
+            
+        true_label = row['true_label']
+        pred_label = row['pred_label']
+        
+        predictions.append({
+            'filename': row['filename'],
+            'true_label': true_label,
+            'pred_label': pred_label,
+            'pred_confidence': float(row['pred_confidence']),
+            # 대소문자 구분 없는 비교 결과를 읽을 때 한 번만 계산 (casefold는 유니코드에도 정확)
+            'is_correct': true_label.casefold() == pred_label.casefold()
+        })
     
     if not predictions:
         raise ValueError(
@@ -72,66 +81,52 @@ def load_predictions_from_csv(csv_path: Path) -> List[Dict]:
     return predictions
 
 
-def calculate_overall_accuracy(predictions: List[Dict]) -> Dict[str, any]:
+def evaluate_predictions(
+    predictions: List[Dict]
+) -> Tuple[Dict[str, any], Dict[str, Dict], List[Dict]]:
     """
-    전체 정확도를 계산합니다.
+    예측 결과를 한 번만 순회하면서 전체 정확도, 농작물별 통계,
+    오분류 목록을 함께 계산합니다.
     
     Args:
-        predictions: 예측 결과 리스트
+        predictions: 예측 결과 리스트 (load_predictions_from_csv의 반환값)
         
     Returns:
-        {'total': 총개수, 'correct': 정답개수, 'accuracy': 정확도} 딕셔너리
+        (전체 정확도 정보, 농작물별 통계, 잘못 분류된 이미지 리스트) 튜플
+        - 전체 정확도 정보: {'total': 총개수, 'correct': 정답개수, 'accuracy': 정확도}
+        - 농작물별 통계: {농작물명: {통계정보}}
     """
     if not predictions:
-        return {'total': 0, 'correct': 0, 'accuracy': 0.0}
-    
-    total_count = len(predictions)
-    correct_count = 0
-    
-    for prediction in predictions:
-        # 대소문자 구분 없이 비교
-        if prediction['true_label'].lower() == prediction['pred_label'].lower():
-            correct_count += 1
-    
-    accuracy = (correct_count / total_count) * 100
+        return {'total': 0, 'correct': 0, 'accuracy': 0.0}, {}, []
     
-    return {
-        'total': total_count,
-        'correct': correct_count,
-        'accuracy': accuracy
-    }
-
-
-def calculate_per_crop_statistics(predictions: List[Dict]) -> Dict[str, Dict]:
-    """
-    농작물별 통계를 계산합니다.
-    
-    Args:
-        predictions: 예측 결과 리스트
-        
-    Returns:
-        {농작물명: {통계정보}} 딕셔너리
-    """
     # 농작물별로 데이터 그룹화
     crop_data = defaultdict(lambda: {
         'total': 0,
         'correct': 0,
         'confidence_sum': 0.0
     })
+    misclassified = []
+    correct_count = 0
     
     for prediction in predictions:
-        true_crop = prediction['true_label']
-        pred_crop = prediction['pred_label']
-        confidence = prediction['pred_confidence']
+        crop = crop_data[prediction['true_label']]
+        crop['total'] += 1
+        crop['confidence_sum'] += prediction['pred_confidence']
         
-        crop_data[true_crop]['total'] += 1
-        crop_data[true_crop]['confidence_sum'] += confidence
-        
-        # 정답 여부 확인
-        if true_crop.lower() == pred_crop.lower():
-            crop_data[true_crop]['correct'] += 1
+        if prediction['is_correct']:
+            correct_count += 1
+            crop['correct'] += 1
+        else:
+            misclassified.append(prediction)
     
-    # 통계 계산
+    total_count = len(predictions)
+    accuracy_info = {
+        'total': total_count,
+        'correct': correct_count,
+        'accuracy': (correct_count / total_count) * 100
+    }
+    
+    # 농작물별 통계 계산
     crop_statistics = {}
     
     for crop_name, data in crop_data.items():
@@ -145,26 +140,7 @@ def calculate_per_crop_statistics(predictions: List[Dict]) -> Dict[str, Dict]:
             'avg_confidence': avg_confidence
         }
     
-    return crop_statistics
-
-
-def find_misclassified_images(predictions: List[Dict]) -> List[Dict]:
-    """
-    잘못 분류된 이미지들을 찾아 반환합니다.
-    
-    Args:
-        predictions: 예측 결과 리스트
-        
-    Returns:
-        잘못 분류된 이미지 정보 리스트
-    """
-    misclassified = []
-    
-    for prediction in predictions:
-        if prediction['true_label'].lower() != prediction['pred_label'].lower():
-            misclassified.append(prediction)
-    
-    return misclassified
+    return accuracy_info, crop_statistics, misclassified
 
 
 def display_overall_results(accuracy_info: Dict[str, any]) -> None:
@@ -263,16 +239,12 @@ def main():
         print("⚠️  분석할 예측 결과가 없습니다.")
         return
     
-    # 2. 전체 정확도 계산
-    accuracy_info = calculate_overall_accuracy(predictions)
-    display_overall_results(accuracy_info)
+    # 2. 정확도, 농작물별 통계, 오분류 목록을 한 번에 계산
+    accuracy_info, crop_statistics, misclassified_images = evaluate_predictions(predictions)
     
-    # 3. 농작물별 통계 계산
-    crop_statistics = calculate_per_crop_statistics(predictions)
+    # 3. 결과 출력
+    display_overall_results(accuracy_info)
     display_per_crop_statistics(crop_statistics)
-    
-    # 4. 잘못 분류된 이미지 분석
-    misclassified_images = find_misclassified_images(predictions)
     display_misclassified_images(misclassified_images)
     
     print("=" * 70)
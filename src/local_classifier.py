@@ -0,0 +1,156 @@
+"""
+로컬 농작물 분류 모델 (선택 기능)
+
+models/ 폴더에 ONNX 분류 모델과 라벨 파일이 있으면, Vision API를 호출하기 전에
+로컬에서 먼저 분류합니다. 확신도가 충분히 높으면 그 결과를 그대로 사용하고,
+애매한 이미지만 Vision API로 보냅니다.
+
+필요한 파일:
+- models/crop_classifier.onnx        : 224x224 RGB 입력, 클래스별 점수(logit) 출력
+                                       (이미 softmax를 거친 확률을 출력하면 그대로 사용)
+- models/crop_classifier.labels.txt  : 클래스 순서대로 한 줄에 하나씩 한글 농작물 이름
+
+모델 파일이나 onnxruntime/numpy 패키지가 없으면 이 기능은 자동으로 꺼집니다.
+"""
+
+import functools
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from PIL import Image
+
+try:
+    import numpy as np
+    import onnxruntime
+except ImportError:
+    np = None
+    onnxruntime = None
+
+
+# 경로 상수
+PROJECT_ROOT = Path(__file__).parent.parent
+LOCAL_MODEL_PATH = PROJECT_ROOT / 'models' / 'crop_classifier.onnx'
+LOCAL_LABELS_PATH = PROJECT_ROOT / 'models' / 'crop_classifier.labels.txt'
+
+# 이 확신도를 넘을 때만 로컬 결과를 사용 (그 외에는 Vision API로 판단)
+LOCAL_CONFIDENCE_THRESHOLD = 0.85
+
+# 추론 스레드 수 (분류는 이미지마다 프로세스 풀에서 병렬로 실행되므로 세션은 1개 스레드만 사용)
+LOCAL_MODEL_THREADS = 1
+
+# 모델 입력 설정 (ImageNet 기준 전처리)
+MODEL_INPUT_SIZE = (224, 224)
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+@functools.lru_cache(maxsize=1)
+def is_local_classifier_available() -> bool:
+    """
+    로컬 분류 모델을 사용할 수 있는지 확인합니다.
+    
+    Returns:
+        패키지와 모델/라벨 파일이 모두 있으면 True
+    """
+    return (
+        onnxruntime is not None
+        and LOCAL_MODEL_PATH.is_file()
+        and LOCAL_LABELS_PATH.is_file()
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def load_local_model() -> Tuple['onnxruntime.InferenceSession', List[str]]:
+    """
+    ONNX 모델과 라벨 목록을 읽어옵니다. 프로세스당 한 번만 읽습니다.
+    
+    프로세스 풀의 워커마다 세션이 만들어지므로, 세션 기본값(CPU 코어 수만큼의
+    스레드)을 쓰면 워커 수 x 코어 수의 스레드가 경쟁합니다. 세션당 스레드를
+    LOCAL_MODEL_THREADS개로 제한합니다.
+    
+    Returns:
+        (추론 세션, 클래스 순서대로의 라벨 리스트) 튜플
+    """
+    session_options = onnxruntime.SessionOptions()
+    session_options.intra_op_num_threads = LOCAL_MODEL_THREADS
+    session_options.inter_op_num_threads = LOCAL_MODEL_THREADS
+    
+    session = onnxruntime.InferenceSession(
+        str(LOCAL_MODEL_PATH),
+        sess_options=session_options,
+        providers=['CPUExecutionProvider']
+    )
+    
+    labels = [
+        line.strip()
+        for line in LOCAL_LABELS_PATH.read_text(encoding='utf-8-sig').splitlines()
+    ]
+    
+    return session, labels
+
+
+def preprocess_image(image_path: Path) -> 'np.ndarray':
+    """
+    이미지를 모델 입력 형식(1x3x224x224, 정규화된 float32)으로 변환합니다.
+    
+    Args:
+        image_path: 이미지 파일 경로
+        
+    Returns:
+        모델 입력 배열
+    """
+    with Image.open(image_path) as image:
+        # JPEG는 디코딩 단계에서 바로 축소해서 읽음
+        image.draft('RGB', MODEL_INPUT_SIZE)
+        resized_image = image.convert('RGB').resize(
+            MODEL_INPUT_SIZE, Image.Resampling.BILINEAR
+        )
+        
+    pixels = np.asarray(resized_image, dtype=np.float32) / 255.0
+    pixels = (
+        (pixels - np.array(IMAGENET_MEAN, dtype=np.float32))
+        / np.array(IMAGENET_STD, dtype=np.float32)
+    )
+    
+    # HWC -> NCHW
+    return pixels.transpose(2, 0, 1)[np.newaxis, ...]
+
+
+def classify_locally(image_path: Path) -> Optional[Dict[str, any]]:
+    """
+    로컬 모델로 이미지를 분류합니다.
+    
+    Args:
+        image_path: 분류할 이미지 파일 경로
+        
+    Returns:
+        확신도가 LOCAL_CONFIDENCE_THRESHOLD를 넘으면
+        call_vision_api_async와 같은 {"crop": "사과", "confidence": 0.93} 형식의 딕셔너리,
+        모델을 사용할 수 없거나 확신도가 낮으면 None
+    """
+    if not is_local_classifier_available():
+        return None
+        
+    session, labels = load_local_model()
+    
+    input_name = session.get_inputs()[0].name
+    scores = session.run(None, {input_name: preprocess_image(image_path)})[0][0]
+    
+    # 모델이 이미 확률을 출력하면 그대로 사용 (softmax를 두 번 하면 확신도가 낮아짐)
+    if scores.min() >= 0 and np.isclose(scores.sum(), 1.0, atol=1e-3):
+        probabilities = scores
+    else:
+        # softmax (수치 안정성을 위해 최댓값을 빼고 계산)
+        exp_scores = np.exp(scores - scores.max())
+        probabilities = exp_scores / exp_scores.sum()
+    
+    best_index = int(probabilities.argmax())
+    best_probability = float(probabilities[best_index])
+    
+    if best_probability <= LOCAL_CONFIDENCE_THRESHOLD or best_index >= len(labels):
+        return None
+        
+    best_label = labels[best_index]
+    if not best_label:
+        return None
+        
+    return {'crop': best_label, 'confidence': best_probability}
@@ -3,135 +3,786 @@
 
 이 모듈은 다음 기능을 제공합니다:
 - 이미지 파일을 base64로 변환
-- OpenAI Vision API 호출
+- OpenAI Vision API 호출 (결과는 이미지 내용 기준으로 디스크에 캐시)
+- Vision API 비동기 호출 (여러 이미지 동시 분류용)
+- OpenAI Batch API를 이용한 대량 분류
 - 정답 라벨 파일 로드
 """
 
+import asyncio
 import base64
+import codecs
+import functools
+import hashlib
+import inspect
+import io
 import json
 import csv
+import logging
+import mmap
+import os
+import tempfile
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import AsyncIterable, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import openai
+from PIL import Image, ImageOps
+
+
+# 오류/경고는 print 대신 logging으로 출력 (출력 방식은 실행 스크립트에서 설정)
+logger = logging.getLogger(__name__)
 
 
 # 상수 정의: 매직 넘버/문자열 방지
 SUPPORTED_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+SUPPORTED_IMAGE_EXTENSION_SET = frozenset(SUPPORTED_IMAGE_EXTENSIONS)
 BASE64_IMAGE_PREFIX = 'data:image/jpeg;base64,'
 VISION_MODEL_NAME = 'gpt-4o-mini'
-API_MAX_TOKENS = 300
+API_MAX_CONCURRENCY = 20
+
+# JSON 모드로 JSON 객체를 요청 (출력 한도에 걸려 잘린 응답은 파싱에 실패할 수 있음)
+# 응답은 {"crop": ..., "confidence": ...} 정도(약 20토큰)이므로 출력 한도를 작게 설정
+API_RESPONSE_FORMAT = {"type": "json_object"}
+API_MAX_TOKENS = 60
+
+# 일시적인 오류(429 속도 제한, 5xx, 연결/타임아웃) 재시도 횟수
+# SDK가 지수 백오프 + 지터로 대기하며, 서버의 Retry-After 헤더도 따름
+API_MAX_RETRIES = 3
+
+# Batch API 설정
+BATCH_ENDPOINT = '/v1/chat/completions'
+BATCH_COMPLETION_WINDOW = '24h'
+BATCH_POLL_INTERVAL_SECONDS = 30
+BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+# 배치 입력 파일 한도 (API 제한: 파일당 200MB, 요청 50,000개)
+# 이미지 한 장이 약 200~300KB이므로 수백 장마다 파일을 나눠 여러 배치로 제출
+BATCH_MAX_FILE_BYTES = 190 * 1024 * 1024
+BATCH_MAX_REQUESTS = 50_000
+
+# 전송 전 이미지 축소 설정: 모델이 어차피 축소해서 보므로 긴 변 1024px면 충분함
+MAX_IMAGE_DIMENSION = 1024
+JPEG_QUALITY = 85
+
+# 이 크기 이하의 작은 JPEG는 다시 인코딩하지 않고 그대로 전송
+PASSTHROUGH_MAX_JPEG_BYTES = 500_000
+JPEG_SIGNATURE = b'\xff\xd8\xff'
+
+# 파일 해시 계산 시 한 번에 읽는 크기
+HASH_CHUNK_SIZE = 64 * 1024
+
+# API 응답 캐시 폴더 (모델별로 분리, 초기화하려면 폴더를 삭제)
+VISION_CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'vision'
+VISION_RESULT_CACHE_DIR = VISION_CACHE_DIR / VISION_MODEL_NAME
+
+# 인코딩된 이미지(base64) 캐시 폴더 (인코딩 형식이 바뀌면 버전을 올림)
+BASE64_CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'base64'
+BASE64_CACHE_VERSION = 2
+
+# 분류 프롬프트 (매 호출마다 다시 만들지 않도록 모듈 상수로 정의)
+# 시스템 프롬프트: 모델의 역할과 출력 형식 지정 (한글 지원)
+VISION_SYSTEM_PROMPT = """당신은 농작물 이미지 분류 전문가입니다.
+절대로 파일명을 보지 말고, 오직 이미지 내용만 보고 판단하세요.
+반드시 다음과 같은 JSON 형식으로만 답변하세요:
+{"crop": "사과", "confidence": 0.93}
+
+규칙:
+- "crop": 농작물의 한글 이름 (예: "사과", "딸기", "토마토", "고추", "포도")
+- "confidence": 0.0에서 1.0 사이의 소수점 숫자
+- 추가 설명이나 마크다운 형식 없이 JSON만 반환하세요
+- 반드시 JSON 객체만 반환하세요"""
+
+# 사용자 프롬프트: 구체적인 요청 (한글)
+VISION_USER_PROMPT = """이 이미지를 보고 어떤 농작물인지 식별하세요.
+농작물 이름(한글)과 확신도를 포함한 JSON 객체만 반환하세요."""
+
+VISION_BASE_MESSAGES = [
+    {
+        "role": "system",
+        "content": VISION_SYSTEM_PROMPT
+    }
+]
+
+VISION_USER_TEXT_PART = {
+    "type": "text",
+    "text": VISION_USER_PROMPT
+}
+
+
+@functools.lru_cache(maxsize=4)
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    """
+    API 키별로 공유하는 OpenAI 클라이언트를 반환합니다.
+    
+    처음 호출될 때 한 번만 만들고 이후에는 같은 객체를 돌려주므로,
+    SDK 내부의 HTTP 연결 풀을 재사용해 요청마다 TLS 핸드셰이크를 하지 않습니다.
+    일시적인 API 오류는 API_MAX_RETRIES번까지 자동으로 재시도합니다.
+    
+    Args:
+        api_key: OpenAI API 키
+        
+    Returns:
+        openai.OpenAI 클라이언트
+    """
+    return openai.OpenAI(api_key=api_key, max_retries=API_MAX_RETRIES)
+
 
+def atomic_write_text(file_path: Path, text: str, encoding: str) -> None:
+    """
+    텍스트를 파일에 원자적으로 저장합니다.
+    
+    같은 폴더의 임시 파일에 쓴 뒤 교체하므로, 동시에 실행 중이거나 중간에
+    중단되더라도 깨진 파일이 남지 않습니다. 폴더가 없으면 만듭니다.
+    
+    Args:
+        file_path: 저장할 파일 경로
+        text: 저장할 내용
+        encoding: 파일 인코딩
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        'w', encoding=encoding, dir=file_path.parent, suffix='.tmp', delete=False
+    ) as temp_file:
+        temp_file.write(text)
+    os.replace(temp_file.name, file_path)
+
+
+def get_cache_file_path(cache_dir: Path, image_data: str) -> Path:
+    """
+    이미지 데이터의 해시로 결과 캐시 파일 경로를 계산합니다.
+    
+    Args:
+        cache_dir: 결과 JSON 파일을 저장하는 폴더
+        image_data: 캐시 키로 사용할 이미지 데이터 (base64 문자열)
+        
+    Returns:
+        캐시 파일 경로
+    """
+    cache_key = hashlib.blake2b(
+        image_data.encode('utf-8'), digest_size=16
+    ).hexdigest()
+    return cache_dir / f"{cache_key}.json"
+
+
+def read_cached_result(cache_file_path: Path) -> Optional[Dict[str, any]]:
+    """
+    저장된 결과를 읽습니다.
+    
+    Args:
+        cache_file_path: 캐시 파일 경로
+        
+    Returns:
+        저장된 결과 딕셔너리, 없거나 깨진 경우 None
+    """
+    try:
+        with open(cache_file_path, 'r', encoding='utf-8') as cache_file:
+            return json.load(cache_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_cached_result(cache_file_path: Path, result: Optional[Dict[str, any]]) -> None:
+    """
+    결과를 캐시 파일에 저장합니다. None(실패) 결과는 저장하지 않습니다.
+    
+    Args:
+        cache_file_path: 캐시 파일 경로
+        result: 저장할 결과 딕셔너리
+    """
+    if result is None:
+        return
+    
+    atomic_write_text(cache_file_path, json.dumps(result, ensure_ascii=False), 'utf-8')
 
-def load_image_as_base64(image_path: str) -> str:
+
+def persistent_cache(cache_dir: Path) -> Callable:
+    """
+    첫 번째 인자(이미지 데이터)의 해시를 키로 함수 결과를 디스크에 저장하는 데코레이터입니다.
+    
+    같은 이미지를 다시 분류하면 API를 호출하지 않고 저장된 결과를 돌려줍니다.
+    None(실패) 결과는 저장하지 않으므로 다음 실행 때 다시 시도합니다.
+    일반 함수와 async 함수 모두에 사용할 수 있습니다.
+    
+    Args:
+        cache_dir: 결과 JSON 파일을 저장할 폴더
+        
+    Returns:
+        함수를 감싸는 데코레이터
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(image_data: str, *args, **kwargs):
+                cache_file_path = get_cache_file_path(cache_dir, image_data)
+                
+                # 캐시 적중: 저장된 결과 반환
+                cached_result = read_cached_result(cache_file_path)
+                if cached_result is not None:
+                    return cached_result
+                
+                result = await func(image_data, *args, **kwargs)
+                write_cached_result(cache_file_path, result)
+                return result
+            
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(image_data: str, *args, **kwargs):
+            cache_file_path = get_cache_file_path(cache_dir, image_data)
+            
+            # 캐시 적중: 저장된 결과 반환
+            cached_result = read_cached_result(cache_file_path)
+            if cached_result is not None:
+                return cached_result
+            
+            result = func(image_data, *args, **kwargs)
+            write_cached_result(cache_file_path, result)
+            return result
+        
+        return wrapper
+    
+    return decorator
+
+
+def compute_file_digest(file_path: Path) -> str:
+    """
+    파일 내용의 해시값을 계산합니다.
+    
+    큰 파일도 메모리에 한꺼번에 올리지 않도록 HASH_CHUNK_SIZE 단위로 나눠 읽습니다.
+    
+    Args:
+        file_path: 해시를 계산할 파일 경로
+        
+    Returns:
+        BLAKE2b 해시의 16진수 문자열
+    """
+    file_hash = hashlib.blake2b(digest_size=16)
+    
+    with open(file_path, 'rb') as target_file:
+        while chunk := target_file.read(HASH_CHUNK_SIZE):
+            file_hash.update(chunk)
+    
+    return file_hash.hexdigest()
+
+
+def is_small_jpeg(image_data: mmap.mmap) -> bool:
+    """
+    이미지가 이미 충분히 작은 JPEG인지 확인합니다.
+    
+    JPEG 시그니처와 파일 크기를 먼저 확인하고, 이미지 크기는 헤더만 읽어서
+    확인하므로 전체 디코딩이 일어나지 않습니다.
+    
+    Args:
+        image_data: 메모리 매핑된 이미지 파일
+        
+    Returns:
+        다시 인코딩할 필요 없는 작은 JPEG이면 True
+    """
+    if image_data[:3] != JPEG_SIGNATURE or len(image_data) > PASSTHROUGH_MAX_JPEG_BYTES:
+        return False
+    
+    with Image.open(image_data) as header_image:
+        return max(header_image.size) <= MAX_IMAGE_DIMENSION
+
+
+def get_base64_cache_path(
+    image_file_path: Path,
+    file_stat: os.stat_result,
+    skip_resize: bool = False
+) -> Path:
+    """
+    이미지 파일의 base64 캐시 파일 경로를 계산합니다.
+    
+    파일 경로와 수정 시각(ns), 크기로 키를 만들기 때문에 파일 내용을 읽지 않고도
+    캐시 적중 여부를 알 수 있고, 파일이 바뀌면 자동으로 새 키가 됩니다.
+    축소/압축 설정도 키에 포함하여 설정을 바꾸면 다시 인코딩합니다.
+    
+    Args:
+        image_file_path: 이미지 파일 경로
+        file_stat: 이미지 파일의 stat 결과
+        skip_resize: 축소 없이 인코딩한 결과인지 여부
+        
+    Returns:
+        캐시 파일 경로
+    """
+    cache_key_source = '|'.join([
+        str(BASE64_CACHE_VERSION),
+        str(image_file_path.resolve()),
+        str(file_stat.st_mtime_ns),
+        str(file_stat.st_size),
+        str(MAX_IMAGE_DIMENSION),
+        str(JPEG_QUALITY),
+        str(skip_resize),
+    ])
+    cache_key = hashlib.blake2b(
+        cache_key_source.encode('utf-8'), digest_size=16
+    ).hexdigest()
+    return BASE64_CACHE_DIR / f"{cache_key}.b64"
+
+
+def encode_image_as_base64(image_file_path: Path, skip_resize: bool = False) -> str:
+    """
+    이미지 파일을 읽어 base64 인코딩된 문자열로 변환합니다.
+    
+    파일은 메모리 매핑(mmap)으로 열어 힙에 통째로 복사하지 않습니다.
+    이미 작은 JPEG는 파일 내용을 그대로 인코딩하고, 그 외에는
+    업로드 크기를 줄이기 위해 긴 변이 MAX_IMAGE_DIMENSION을 넘지 않도록
+    축소한 뒤 JPEG로 다시 인코딩합니다.
+    
+    Args:
+        image_file_path: 변환할 이미지 파일의 경로
+        skip_resize: True면 축소하지 않음 (이미 전처리한 이미지용).
+            JPEG는 그대로, 그 외 형식은 원본 크기 그대로 JPEG로 변환
+        
+    Returns:
+        base64로 인코딩된 JPEG 이미지 문자열 (data URI 접두어 없음)
+    """
+    with open(image_file_path, 'rb') as image_file, \
+            mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_data:
+        # 작은 JPEG: 페이지 캐시에서 바로 인코딩 (재인코딩 시 오히려 용량이 커질 수 있음)
+        is_jpeg = image_data[:3] == JPEG_SIGNATURE
+        if (skip_resize and is_jpeg) or is_small_jpeg(image_data):
+            return base64.b64encode(image_data).decode('ascii')
+        
+        with Image.open(image_data) as image:
+            # 휴대폰 사진의 회전 정보(EXIF)를 픽셀에 반영한 뒤 축소
+            image = ImageOps.exif_transpose(image)
+            if not skip_resize:
+                image.thumbnail(
+                    (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION),
+                    Image.Resampling.LANCZOS
+                )
+            
+            jpeg_buffer = io.BytesIO()
+            image.convert('RGB').save(
+                jpeg_buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True
+            )
+    
+    # getbuffer()는 복사 없이 버퍼를 참조하고, base64 결과는 ASCII뿐이므로 ascii로 디코딩
+    return base64.b64encode(jpeg_buffer.getbuffer()).decode('ascii')
+
+
+def load_image_as_base64(image_path: str, skip_resize: bool = False) -> str:
     """
     이미지 파일을 base64 인코딩된 문자열로 변환합니다.
     
+    인코딩 결과는 BASE64_CACHE_DIR에 저장되어, 파일이 바뀌지 않았다면
+    다음 실행부터는 다시 인코딩하지 않고 저장된 문자열을 사용합니다.
+    
     Args:
         image_path: 변환할 이미지 파일의 경로
+        skip_resize: True면 축소 단계를 건너뜀 (호출하는 쪽에서 이미 전처리한 경우)
         
     Returns:
-        base64로 인코딩된 이미지 문자열 (data URI 형식)
+        base64로 인코딩된 JPEG 이미지 문자열 (data URI 접두어 없음)
         
     Raises:
         FileNotFoundError: 이미지 파일이 존재하지 않는 경우
     """
     image_file_path = Path(image_path)
     
-    if not image_file_path.exists():
-        raise FileNotFoundError(f"이미지 파일을 찾을 수 없습니다: {image_path}")
+    # 존재 여부를 따로 확인하지 않고 stat 한 번으로 처리 (캐시 키에도 사용)
+    try:
+        file_stat = image_file_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"이미지 파일을 찾을 수 없습니다: {image_path}") from None
+    
+    cache_file_path = get_base64_cache_path(image_file_path, file_stat, skip_resize)
+    
+    # 캐시 적중: 저장된 문자열 반환
+    try:
+        return cache_file_path.read_text(encoding='ascii')
+    except FileNotFoundError:
+        pass
+    
+    image_base64 = encode_image_as_base64(image_file_path, skip_resize)
+    atomic_write_text(cache_file_path, image_base64, 'ascii')
+    
+    return image_base64
+
+
+def build_vision_messages(image_base64: str) -> List[Dict[str, any]]:
+    """
+    농작물 분류 요청에 사용할 메시지 목록을 만듭니다.
+    
+    비동기 호출(call_vision_api_async)과 Batch API 요청이 같은 프롬프트를 쓰도록
+    메시지 구성을 한 곳에서 관리합니다. 고정된 시스템 메시지/텍스트 파트는
+    모듈 상수를 재사용하고 이미지 파트만 새로 만듭니다.
+    
+    Args:
+        image_base64: base64 인코딩된 JPEG 이미지 문자열 (data URI 접두어는 여기서 붙임)
+        
+    Returns:
+        chat.completions API의 messages 인자로 전달할 리스트
+    """
+    return VISION_BASE_MESSAGES + [
+        {
+            "role": "user",
+            "content": [
+                VISION_USER_TEXT_PART,
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": BASE64_IMAGE_PREFIX + image_base64
+                    }
+                }
+            ]
+        }
+    ]
+
+
+def build_vision_request_body(image_base64: str) -> Dict[str, any]:
+    """
+    농작물 분류 요청 본문(chat.completions 인자)을 만듭니다.
+    
+    비동기 호출과 Batch API 요청이 같은 모델/옵션으로 요청하도록 한 곳에서 관리합니다.
     
-    with open(image_file_path, 'rb') as image_file:
-        image_binary_data = image_file.read()
-        encoded_image = base64.b64encode(image_binary_data).decode('utf-8')
+    Args:
+        image_base64: base64 인코딩된 JPEG 이미지 문자열
         
-    return f"{BASE64_IMAGE_PREFIX}{encoded_image}"
+    Returns:
+        chat.completions.create에 키워드 인자로 넘길 딕셔너리
+    """
+    return {
+        "model": VISION_MODEL_NAME,
+        "messages": build_vision_messages(image_base64),
+        "max_tokens": API_MAX_TOKENS,
+        "response_format": API_RESPONSE_FORMAT
+    }
 
 
-def call_vision_api(
+@persistent_cache(VISION_RESULT_CACHE_DIR)
+async def call_vision_api_async(
     image_base64: str,
-    api_key: str
+    client: openai.AsyncOpenAI
 ) -> Optional[Dict[str, any]]:
     """
-    OpenAI Vision API를 호출하여 이미지 속 농작물을 분류합니다.
+    OpenAI Vision API를 비동기로 호출하여 이미지 속 농작물을 분류합니다.
     
     이 함수는 파일명이 아닌 오직 이미지 내용만으로 판단하도록
     명확한 프롬프트를 사용합니다.
+    같은 이미지의 결과는 VISION_CACHE_DIR에 저장되어 재사용됩니다.
     
     Args:
         image_base64: base64 인코딩된 이미지 문자열
-        api_key: OpenAI API 키
+        client: 현재 이벤트 루프에서 만든 AsyncOpenAI 클라이언트
         
     Returns:
         {"crop": "apple", "confidence": 0.93} 형식의 딕셔너리
         오류 발생 시 None 반환
     """
-    # API 클라이언트 설정
-    client = openai.OpenAI(api_key=api_key)
+    try:
+        response = await client.chat.completions.create(
+            **build_vision_request_body(image_base64)
+        )
+    except Exception as api_error:
+        logger.error("❌ API 호출 중 오류 발생: %s", api_error)
+        return None
     
-    # 시스템 프롬프트: 모델의 역할과 출력 형식 지정 (한글 지원)
-    system_prompt = """당신은 농작물 이미지 분류 전문가입니다.
-절대로 파일명을 보지 말고, 오직 이미지 내용만 보고 판단하세요.
-반드시 다음과 같은 JSON 형식으로만 답변하세요:
-{"crop": "사과", "confidence": 0.93}
+    response_text = response.choices[0].message.content
+    
+    # JSON 모드라도 API_MAX_TOKENS에 걸려 잘리면(finish_reason == 'length') 파싱에 실패함
+    try:
+        return json.loads(response_text)
+    except (TypeError, json.JSONDecodeError):
+        logger.warning("⚠️  JSON 파싱 실패. 응답: %s", response_text)
+        return None
 
-규칙:
-- "crop": 농작물의 한글 이름 (예: "사과", "딸기", "토마토", "고추", "포도")
-- "confidence": 0.0에서 1.0 사이의 소수점 숫자
-- 추가 설명이나 마크다운 형식 없이 JSON만 반환하세요
-- 반드시 JSON 객체만 반환하세요"""
 
-    # 사용자 프롬프트: 구체적인 요청 (한글)
-    user_prompt = """이 이미지를 보고 어떤 농작물인지 식별하세요.
-농작물 이름(한글)과 확신도를 포함한 JSON 객체만 반환하세요."""
+async def call_vision_api_batch(
+    image_payloads: Union[Iterable[str], AsyncIterable[str]],
+    api_key: str,
+    concurrency: int = API_MAX_CONCURRENCY,
+    on_complete: Optional[Callable[[int, Optional[Dict[str, any]]], None]] = None
+) -> List[Optional[Dict[str, any]]]:
+    """
+    여러 이미지를 비동기로 동시에 분류합니다.
+    
+    API 호출은 대부분 네트워크 대기 시간이므로, 하나의 이벤트 루프에서
+    최대 concurrency개의 요청을 동시에 보내 전체 소요 시간을 줄입니다.
+    image_payloads로 비동기 생성기를 넘기면 요청 자리가 빌 때만 다음 이미지를
+    꺼내므로, 인코딩과 API 호출을 겹치면서도 대기 중인 이미지가 쌓이지 않습니다.
+    
+    AsyncOpenAI 클라이언트는 실행마다 새로 만들고 끝나면 닫습니다. 클라이언트의
+    연결 풀은 만든 이벤트 루프에 묶이므로, 프로세스 전역으로 공유하면 다음
+    asyncio.run에서 "Event loop is closed" 오류가 납니다. 한 번의 실행 동안에는
+    모든 요청이 같은 연결 풀을 쓰며, SDK 기본 연결 한도(최대 1000개, keep-alive 100개)가
+    API_MAX_CONCURRENCY보다 충분히 크므로 동시 요청이 연결을 기다리며 막히지 않습니다.
+    
+    Args:
+        image_payloads: base64 인코딩된 이미지 문자열의 리스트 또는 (비동기) 이터러블
+        api_key: OpenAI API 키
+        concurrency: 동시에 보낼 최대 요청 수
+        on_complete: 요청 하나가 끝날 때마다 (인덱스, 결과)로 호출되는 함수 (진행 표시용)
+        
+    Returns:
+        입력 순서와 같은 순서의 분류 결과 리스트 (실패한 항목은 None)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def iterate_payloads():
+        if hasattr(image_payloads, '__aiter__'):
+            async for image_base64 in image_payloads:
+                yield image_base64
+        else:
+            for image_base64 in image_payloads:
+                yield image_base64
+    
+    async def classify_one(index: int, image_base64: str) -> Optional[Dict[str, any]]:
+        try:
+            result = await call_vision_api_async(image_base64, client)
+        finally:
+            semaphore.release()
+        
+        if on_complete is not None:
+            on_complete(index, result)
+        
+        return result
+    
+    tasks = []
+    payload_iterator = aiter(iterate_payloads())
+    
+    async with openai.AsyncOpenAI(api_key=api_key, max_retries=API_MAX_RETRIES) as client:
+        while True:
+            # 요청 자리가 생긴 뒤에 다음 이미지를 꺼냄 (생성기에 대한 역압력)
+            await semaphore.acquire()
+            try:
+                image_base64 = await anext(payload_iterator)
+            except StopAsyncIteration:
+                semaphore.release()
+                break
+            
+            tasks.append(asyncio.create_task(classify_one(len(tasks), image_base64)))
+        
+        return await asyncio.gather(*tasks)
+
+
+def build_batch_request_line(custom_id: str, image_base64: str) -> bytes:
+    """
+    Batch API 입력 JSONL의 요청 한 줄을 만듭니다.
+    
+    Args:
+        custom_id: 요청ID (결과와 짝을 맞추는 데 사용)
+        image_base64: base64 인코딩된 이미지 문자열
+        
+    Returns:
+        줄바꿈을 포함한 UTF-8 바이트
+    """
+    request_line = json.dumps({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": build_vision_request_body(image_base64)
+    }, ensure_ascii=False)
+    return (request_line + '\n').encode('utf-8')
+
+
+def submit_vision_batch(
+    client: openai.OpenAI,
+    request_file: BinaryIO,
+    request_count: int
+) -> 'openai.types.Batch':
+    """
+    요청 JSONL 파일을 업로드하고 배치 작업을 생성합니다.
+    
+    Args:
+        client: OpenAI 클라이언트
+        request_file: build_batch_request_line으로 만든 요청 줄을 쓴 임시 파일
+        request_count: 파일에 담긴 요청 수 (로그용)
+        
+    Returns:
+        생성된 배치 작업 객체
+    """
+    # 메모리에 다시 모으지 않고 파일 핸들을 그대로 업로드
+    request_file.seek(0)
+    input_file = client.files.create(
+        file=('vision_batch.jsonl', request_file),
+        purpose='batch'
+    )
+    
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW
+    )
+    logger.info("ℹ️  배치 작업 생성: %s (%d개 요청)", batch.id, request_count)
+    return batch
+
 
+def run_vision_batch(
+    image_payloads: Iterable[Tuple[str, str]],
+    api_key: str,
+    poll_interval_seconds: int = BATCH_POLL_INTERVAL_SECONDS
+) -> Dict[str, Optional[Dict[str, any]]]:
+    """
+    OpenAI Batch API로 여러 이미지를 한 번에 분류합니다.
+    
+    요청을 JSONL 파일로 업로드한 뒤 작업이 끝날 때까지 기다렸다가
+    결과 파일을 내려받아 파싱합니다. 동기 호출보다 느리지만 요금이 절반이고
+    속도 제한에 걸리지 않아 대량의 이미지를 분류할 때 적합합니다.
+    
+    이미지를 하나씩 받아 요청 줄을 바로 임시 파일에 쓰므로 base64 문자열이
+    메모리에 쌓이지 않습니다. 입력 파일 한도(BATCH_MAX_FILE_BYTES, BATCH_MAX_REQUESTS)에
+    이르면 그 파일을 제출하고 새 파일에 이어서 씁니다. 동기 호출과 같은 결과 캐시를
+    사용하므로 이미 분류한 이미지는 제출하지 않고, 새 결과는 캐시에 저장합니다.
+    
+    Args:
+        image_payloads: (요청ID(파일명), base64 인코딩된 이미지) 튜플의 이터러블 (생성기 가능)
+        api_key: OpenAI API 키
+        poll_interval_seconds: 작업 상태 확인 간격 (초)
+        
+    Returns:
+        {요청ID: {"crop": ..., "confidence": ...}} 딕셔너리
+        개별 요청이나 해당 배치 작업이 실패한 경우 값은 None
+        
+    Raises:
+        RuntimeError: 제출한 배치 작업이 하나도 완료되지 못한 경우 (실패/만료/취소)
+    """
+    client = get_openai_client(api_key)
+    results = {}
+    
+    # 요청ID별 결과 캐시 경로 (base64는 보관하지 않음)
+    cache_file_paths = {}
+    
+    # 1. 캐시 확인 후 요청 줄을 임시 파일에 쓰고, 한도에 이르면 업로드 및 배치 작업 생성
+    batches = []
+    request_file = None
+    request_count = 0
+    
     try:
-        response = client.chat.completions.create(
-            model=VISION_MODEL_NAME,
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": user_prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": image_base64
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=API_MAX_TOKENS
-        )
+        for custom_id, image_base64 in image_payloads:
+            cache_file_path = get_cache_file_path(VISION_RESULT_CACHE_DIR, image_base64)
+            cached_result = read_cached_result(cache_file_path)
+            results[custom_id] = cached_result
+            
+            # 캐시 적중: 배치에 넣지 않음
+            if cached_result is not None:
+                continue
+            
+            cache_file_paths[custom_id] = cache_file_path
+            request_line = build_batch_request_line(custom_id, image_base64)
+            
+            # 현재 파일에 더 넣으면 한도를 넘는 경우 먼저 제출
+            if request_file is not None and (
+                request_file.tell() + len(request_line) > BATCH_MAX_FILE_BYTES
+                or request_count >= BATCH_MAX_REQUESTS
+            ):
+                batches.append(submit_vision_batch(client, request_file, request_count))
+                request_file.close()
+                request_file = None
+            
+            if request_file is None:
+                request_file = tempfile.TemporaryFile('w+b')
+                request_count = 0
+            
+            request_file.write(request_line)
+            request_count += 1
+        
+        if request_file is not None:
+            batches.append(submit_vision_batch(client, request_file, request_count))
+    finally:
+        if request_file is not None:
+            request_file.close()
+    
+    cached_count = len(results) - len(cache_file_paths)
+    if cached_count:
+        logger.info("ℹ️  캐시된 결과 %d개는 배치에 넣지 않았습니다.", cached_count)
+    
+    if not batches:
+        return results
+    
+    # 2. 모든 배치가 끝날 때까지 주기적으로 상태 확인
+    while any(batch.status not in BATCH_FINAL_STATUSES for batch in batches):
+        time.sleep(poll_interval_seconds)
         
-        # 응답 텍스트 추출
-        response_text = response.choices[0].message.content.strip()
+        for index, batch in enumerate(batches):
+            if batch.status in BATCH_FINAL_STATUSES:
+                continue
+            
+            batch = batches[index] = client.batches.retrieve(batch.id)
+            
+            counts = batch.request_counts
+            if counts is not None:
+                logger.info(
+                    "   ⏳ %s %s: %d/%d 완료",
+                    batch.id, batch.status, counts.completed, counts.total
+                )
+    
+    completed_batches = []
+    
+    # 실패한 배치의 이미지는 None으로 남기고, 완료된 배치의 결과는 그대로 사용
+    for batch in batches:
+        if batch.status == 'completed' and batch.output_file_id is not None:
+            completed_batches.append(batch)
+        else:
+            logger.error("❌ 배치 작업이 완료되지 않았습니다: %s (%s)", batch.id, batch.status)
+    
+    if not completed_batches:
+        raise RuntimeError(
+            f"배치 작업이 완료되지 않았습니다: {', '.join(batch.id for batch in batches)}"
+        )
+    
+    # 3. 결과 파일 파싱 및 캐시 저장
+    for batch in completed_batches:
+        output_text = client.files.content(batch.output_file_id).text
         
-        # JSON 파싱 시도
-        try:
-            result = json.loads(response_text)
-            return result
-        except json.JSONDecodeError:
-            print(f"⚠️  JSON 파싱 실패. 응답: {response_text}")
-            return None
+        for line in output_text.splitlines():
+            if not line.strip():
+                continue
             
-    except Exception as api_error:
-        print(f"❌ API 호출 중 오류 발생: {str(api_error)}")
-        return None
+            output = json.loads(line)
+            response = output.get('response') or {}
+            
+            if output.get('error') or response.get('status_code') != 200:
+                logger.error("❌ %s 요청 실패: %s", output.get('custom_id'), output.get('error'))
+                continue
+            
+            custom_id = output['custom_id']
+            response_text = response['body']['choices'][0]['message']['content']
+            
+            # 출력 한도에 걸려 JSON이 잘린 경우에만 실패
+            try:
+                results[custom_id] = json.loads(response_text)
+            except json.JSONDecodeError:
+                logger.warning("⚠️  %s JSON 파싱 실패. 응답: %s", custom_id, response_text)
+                continue
+            
+            write_cached_result(cache_file_paths[custom_id], results[custom_id])
+    
+    return results
+
+
+def decode_csv_bytes(raw_data: bytes) -> Tuple[str, str]:
+    """
+    CSV 파일 바이트의 인코딩을 판별하여 문자열로 변환합니다.
+    
+    UTF-8 BOM이 있으면 utf-8-sig, 없으면 utf-8로 읽고,
+    utf-8로 읽을 수 없는 경우(Windows 한글 엑셀 저장 등)에만 cp949로 읽습니다.
+    
+    Args:
+        raw_data: CSV 파일 전체 바이트
+        
+    Returns:
+        (디코딩된 CSV 텍스트, 사용한 인코딩) 튜플
+        
+    Raises:
+        UnicodeDecodeError: cp949로도 읽을 수 없는 경우
+    """
+    if raw_data.startswith(codecs.BOM_UTF8):
+        return raw_data.decode('utf-8-sig'), 'utf-8-sig'
+    
+    try:
+        return raw_data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        # cp949는 euc-kr의 상위 집합이므로 euc-kr 파일도 함께 처리됨
+        return raw_data.decode('cp949'), 'cp949'
 
 
 def load_answers_from_csv(csv_path: str) -> Dict[str, str]:
     """
     answer.csv 파일에서 정답 라벨을 읽어 딕셔너리로 반환합니다.
     
-    여러 인코딩을 자동으로 시도하여 Windows 환경에서도 안전하게 작동합니다.
+    decode_csv_bytes로 인코딩을 판별하여 Windows 환경에서도 안전하게 작동합니다.
     
     Args:
         csv_path: answer.csv 파일의 경로
@@ -145,39 +796,51 @@ def load_answers_from_csv(csv_path: str) -> Dict[str, str]:
     """
     csv_file_path = Path(csv_path)
     
-    if not csv_file_path.exists():
-        raise FileNotFoundError(f"라벨 파일을 찾을 수 없습니다: {csv_path}")
+    # 파일은 한 번만 읽고, 인코딩은 메모리의 바이트에 대해 시도
+    try:
+        raw_data = csv_file_path.read_bytes()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"라벨 파일을 찾을 수 없습니다: {csv_path}") from None
     
     labels_dict = {}
     
-    # Windows에서 흔히 사용되는 인코딩들을 순서대로 시도
-    encodings_to_try = ['utf-8-sig', 'utf-8', 'cp949', 'euc-kr']
-    successful_encoding = None
+    try:
+        csv_text, csv_encoding = decode_csv_bytes(raw_data)
+    except UnicodeDecodeError:
+        # 지원하는 인코딩으로 읽을 수 없으면 빈 결과로 처리
+        csv_text, csv_encoding = None, None
     
-    for encoding in encodings_to_try:
-        try:
-            with open(csv_file_path, 'r', encoding=encoding, newline='') as csv_file:
-                csv_reader = csv.DictReader(csv_file)
-                
-                # 데이터 읽기 시도
-                for row in csv_reader:
-                    filename = row['filename'].strip()
-                    label = row['label'].strip()
-                    
-                    # 빈 라벨 체크
-                    if not label:
-                        print(f"⚠️  경고: {filename}의 라벨이 비어있습니다. 수동으로 입력해주세요.")
-                        continue
-                        
-                    labels_dict[filename] = label
-                
-                successful_encoding = encoding
-                break
-                
-        except (UnicodeDecodeError, UnicodeError, KeyError):
-            # 이 인코딩으로 실패하면 다음 시도
-            labels_dict = {}
-            continue
+    if csv_text is not None:
+        csv_reader = csv.reader(io.StringIO(csv_text, newline=''))
+        header = next(csv_reader, [])
+        
+        # 필수 컬럼(filename, label)이 없으면 빈 결과로 처리
+        if 'filename' in header and 'label' in header:
+            filename_index = header.index('filename')
+            label_index = header.index('label')
+            min_row_length = max(filename_index, label_index) + 1
+            
+            # 빈 줄이나 컬럼이 부족한 줄은 건너뜀
+            label_rows = [
+                (row[filename_index].strip(), row[label_index].strip())
+                for row in csv_reader
+                if len(row) >= min_row_length
+            ]
+            
+            labels_dict = {
+                filename: label for filename, label in label_rows if label
+            }
+            
+            # 빈 라벨 체크 (읽기가 끝난 뒤 한 번에 출력)
+            empty_label_filenames = [
+                filename for filename, label in label_rows if not label
+            ]
+            if empty_label_filenames:
+                logger.warning(
+                    "⚠️  경고: 라벨이 비어있는 파일이 %d개 있습니다. 수동으로 입력해주세요: %s",
+                    len(empty_label_filenames),
+                    ', '.join(empty_label_filenames)
+                )
     
     if not labels_dict:
         raise ValueError(
@@ -185,8 +848,8 @@ def load_answers_from_csv(csv_path: str) -> Dict[str, str]:
         )
     
     # 성공한 인코딩 정보 출력
-    if successful_encoding and successful_encoding != 'utf-8':
-        print(f"ℹ️  {csv_path}를 {successful_encoding} 인코딩으로 읽었습니다.")
+    if csv_encoding != 'utf-8':
+        logger.info("ℹ️  %s를 %s 인코딩으로 읽었습니다.", csv_path, csv_encoding)
     
     return labels_dict
 
@@ -204,5 +867,32 @@ def validate_image_file(file_path: Path) -> bool:
     if not file_path.is_file():
         return False
     
-    return file_path.suffix.lower() in SUPPORTED_IMAGE_EXTENSIONS
+    # 대부분 이미 소문자이므로 lower() 변환은 그대로 찾지 못했을 때만 수행
+    suffix = file_path.suffix
+    return (
+        suffix in SUPPORTED_IMAGE_EXTENSION_SET
+        or suffix.lower() in SUPPORTED_IMAGE_EXTENSION_SET
+    )
+
 
+def validate_dir_entry(entry: os.DirEntry) -> bool:
+    """
+    os.scandir로 얻은 항목이 유효한 이미지 파일인지 확인합니다.
+    
+    DirEntry는 디렉토리를 읽을 때 받아온 파일 종류를 캐시하므로
+    validate_image_file과 달리 파일마다 stat을 호출하지 않습니다.
+    
+    Args:
+        entry: 검증할 디렉토리 항목
+        
+    Returns:
+        유효한 이미지 파일이면 True, 아니면 False
+    """
+    if not entry.is_file():
+        return False
+    
+    suffix = os.path.splitext(entry.name)[1]
+    return (
+        suffix in SUPPORTED_IMAGE_EXTENSION_SET
+        or suffix.lower() in SUPPORTED_IMAGE_EXTENSION_SET
+    )